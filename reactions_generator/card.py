@@ -1,15 +1,22 @@
 import functools
+import itertools
 import math
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
+from typing import Callable, Iterator, NamedTuple
 
-from PIL import Image, ImageDraw, ImageFont
+import numpy as np
+import numpy.typing as npt
+import PIL
+from PIL import Image, ImageDraw
 
-from reactions_generator.colors import Colors
-from reactions_generator.interpolate import interpolate, Easing
+from reactions_generator.colors import Color, Colors
+from reactions_generator.interpolate import interpolate_array, Easing
 from reactions_generator.utils import (
     Box,
     init_transparent_image,
-    paste_with_alpha,
+    rounded_mask,
     center_anchor,
     place_grid,
     dimensions,
@@ -23,13 +30,12 @@ from reactions_generator.fonts import (
     load_monspaced,
 )
 
+# Pillow-SIMD is a drop-in fork with SSE4/AVX2 compositing and resampling, its releases
+# carry a ".postN" suffix on top of the Pillow version they track.
+PILLOW_SIMD = ".post" in PIL.__version__
 
-@functools.cache
-def load_font(font: ImageFont.FreeTypeFont, size: int) -> ImageFont.FreeTypeFont:
-    return font.font_variant(size=size)
 
-
-@functools.cache
+@functools.lru_cache(maxsize=256)
 def render_place(current_rank: int) -> Image.Image:
     padding = 16
     text = f"{current_rank}{get_ordinal(current_rank)} place"
@@ -46,15 +52,25 @@ def render_place(current_rank: int) -> Image.Image:
     return image
 
 
+# Suffix for every n % 100: 11, 12 and 13 are "th", otherwise the last digit decides.
+ORDINALS = tuple(
+    "th" if n // 10 == 1 else {1: "st", 2: "nd", 3: "rd"}.get(n % 10, "th")
+    for n in range(100)
+)
+
+
 def get_ordinal(n: int) -> str:
-    ord = "th"
-    if n % 10 == 1 and n % 100 != 11:
-        ord = "st"
-    elif n % 10 == 2 and n % 100 != 12:
-        ord = "nd"
-    elif n % 10 == 3 and n % 100 != 13:
-        ord = "rd"
-    return ord
+    return ORDINALS[n % 100]
+
+
+@functools.lru_cache(maxsize=16)
+def render_background(dimensions: tuple[int, int], color: Color) -> Image.Image:
+    # Fill the cached rounded-rectangle mask with NumPy instead of rasterizing the arcs per colour.
+    width, height = dimensions
+    mask = np.asarray(rounded_mask(dimensions)) > 0
+    pixels = np.zeros((height, width, 4), dtype=np.uint8)
+    pixels[mask] = (*color[:3], color[3] if len(color) == 4 else 255)
+    return Image.fromarray(pixels)
 
 
 def split_horizontal(
@@ -75,6 +91,22 @@ def split_vertical(
     return top_box, bottom_box
 
 
+class CardLayout(NamedTuple):
+    logo: Box
+    title: Box
+    subtitle: Box
+    task: Box
+    status: Box
+
+
+class FrameState(NamedTuple):
+    rank: int
+    place_x: int
+    color: Color
+    outcome: str
+    time: str
+
+
 @dataclass(frozen=True)
 class Card:
     title: str
@@ -104,97 +136,187 @@ class Card:
 
     @functools.cached_property
     def resized_logo(self) -> Image.Image:
-        logo = self.logo.copy()
-        factor = min(self.actual_card_height / logo.height, 152 / logo.width)
-        width, height = map(lambda x: math.ceil(x * factor), logo.size)
-        logo = logo.resize((width, height))
-        logo.thumbnail((152, self.actual_card_height))
-        return logo
+        factor = min(self.actual_card_height / self.logo.height, 152 / self.logo.width)
+        width = min(math.ceil(self.logo.width * factor), 152)
+        height = min(math.ceil(self.logo.height * factor), self.actual_card_height)
+        logo = self.logo if self.logo.mode == "RGBA" else self.logo.convert("RGBA")
+        return logo.resize((width, height), Image.Resampling.LANCZOS)
+
+    @functools.cached_property
+    def place_images(self) -> dict[int, Image.Image]:
+        # Only the ranks the animation actually shows, at most one per animated frame;
+        # frames outside it clamp to the first or last entry.
+        return {rank: render_place(rank) for rank in set(self._ranks.tolist())}
+
+    @functools.cached_property
+    def time_strings(self) -> list[str]:
+        # The clock stops at animation_start, so one entry per frame up to it is enough.
+        frames = np.arange(max(self.animation_start, 0) + 1)
+        realtime = (
+            self.time + np.minimum(frames - self.animation_start, 0) / self.fps * 1000
+        )
+        hours = (realtime / (60 * 60 * 1000)).astype(int)
+        minutes = ((realtime % (60 * 60 * 1000)) / (60 * 1000)).astype(int)
+        seconds = ((realtime % (60 * 1000)) / 1000).astype(int)
+        return [
+            f"{h:02d}:{m:02d}:{s:02d}"
+            for h, m, s in zip(hours.tolist(), minutes.tolist(), seconds.tolist())
+        ]
 
     def time_to_string(self, frame: int) -> str:
-        realtime = self.time + min(frame - self.animation_start, 0) / self.fps * 1000
-        hours = int(realtime / (60 * 60 * 1000))
-        minutes = int((realtime % (60 * 60 * 1000)) / (60 * 1000))
-        seconds = int((realtime % (60 * 1000)) / 1000)
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+        return self.time_strings[min(max(frame, 0), len(self.time_strings) - 1)]
 
-    def outcome_animation(self, frame: int) -> str:
+    @functools.cached_property
+    def _outcome_per_frame(self) -> list[str]:
         frame_duration = 6
         outcome_states = ["   ", ".  ", ".. ", " ..", "  ."]
-        if frame >= self.animation_start + 3:
-            return self.outcome.rjust(len(outcome_states[0]))
-        else:
-            return outcome_states[(frame // frame_duration) % len(outcome_states)]
+        frames = np.arange(self.animation_start + 4)
+        indices = (frames // frame_duration) % len(outcome_states)
+        indices[frames >= self.animation_start + 3] = len(outcome_states)
+        states = [*outcome_states, self.outcome.rjust(len(outcome_states[0]))]
+        return [states[index] for index in indices.tolist()]
 
-    def color_animation(
-        self, frame: int
-    ) -> tuple[int, int, int] | tuple[int, int, int, int]:
+    def outcome_animation(self, frame: int) -> str:
+        outcomes = self._outcome_per_frame
+        return outcomes[min(max(frame, 0), len(outcomes) - 1)]
+
+    @functools.cached_property
+    def _color_per_frame(self) -> list[Color]:
         blink_duration = 6
         cycle = [Colors.yellow, Colors.green]
-        if frame >= self.animation_start:
-            if self.success:
-                return Colors.green
-            else:
-                return Colors.red
-        if frame < self.animation_start - 8 * blink_duration:
-            return Colors.yellow
-        return cycle[((self.animation_start - frame) // blink_duration) % len(cycle)]
-
-    def render_frame(
-        self,
-        frame: int,
-    ) -> Image.Image:
-        image = init_transparent_image(self.size)
-        draw = ImageDraw.Draw(image)
-        draw.rounded_rectangle(
-            [(0, self.top_padding), self.size],
-            radius=48,
-            fill=self.color_animation(frame),
-        )
+        frames = np.arange(self.animation_start + 1)
+        indices = ((self.animation_start - frames) // blink_duration) % len(cycle)
+        indices[frames < self.animation_start - 8 * blink_duration] = 0
+        indices[frames >= self.animation_start] = len(cycle)
+        colors = [*cycle, Colors.green if self.success else Colors.red]
+        return [colors[index] for index in indices.tolist()]
 
-        rank = round(
-            interpolate(
-                frame,
+    def color_animation(self, frame: int) -> Color:
+        colors = self._color_per_frame
+        return colors[min(max(frame, 0), len(colors) - 1)]
+
+    @functools.cached_property
+    def _animation_frames(self) -> npt.NDArray[np.int64]:
+        # Rank and place tag only move in [animation_start - 15, animation_start + 6].
+        return np.arange(self.animation_start - 15, self.animation_start + 7)
+
+    @functools.cached_property
+    def _ranks(self) -> npt.NDArray[np.int32]:
+        if self.success:
+            ranks = interpolate_array(
+                self._animation_frames,
                 [self.animation_start - 15, self.animation_start + 5],
                 [self.rank_before, self.rank_after],
             )
-            if self.success
-            else interpolate(
-                frame,
+        else:
+            ranks = interpolate_array(
+                self._animation_frames,
                 [
                     self.animation_start - 15,
                     self.animation_start,
                     self.animation_start + 6,
                 ],
                 [self.rank_before, 1, self.rank_before],
-            ),
-        )
-        place_image = render_place(rank)
-        place_position = (
-            interpolate(
-                frame,
+            )
+        # np.round rounds half to even, exactly like the builtin round.
+        return np.round(ranks).astype(np.int32)
+
+    @functools.cached_property
+    def _place_position_per_frame(self) -> npt.NDArray[np.float64]:
+        if self.success:
+            return interpolate_array(
+                self._animation_frames,
                 [self.animation_start - 15, self.animation_start + 5],
                 [1, 0],
                 easing=Easing.EASE_IN_OUT_QUAD,
             )
-            if self.success
-            else interpolate(
-                frame,
-                [
-                    self.animation_start - 15,
-                    self.animation_start,
-                    self.animation_start + 6,
-                ],
-                [1, 0.7, 1],
-                easing=Easing.EASE_IN_OUT_SIN,
+        return interpolate_array(
+            self._animation_frames,
+            [
+                self.animation_start - 15,
+                self.animation_start,
+                self.animation_start + 6,
+            ],
+            [1, 0.7, 1],
+            easing=Easing.EASE_IN_OUT_SIN,
+        )
+
+    def _animation_index(self, frame: int) -> int:
+        first = int(self._animation_frames[0])
+        return min(max(frame - first, 0), len(self._animation_frames) - 1)
+
+    def frame_state(self, frame: int) -> FrameState:
+        index = self._animation_index(frame)
+        rank = int(self._ranks[index])
+        # Quantize to the pixel the tag lands on, so sub-pixel easing steps share a state.
+        place_width = self.place_images[rank].width
+        place_x = round(
+            (self.width - place_width) * self._place_position_per_frame[index]
+        )
+        return FrameState(
+            rank=rank,
+            place_x=place_x,
+            color=self.color_animation(frame),
+            outcome=self.outcome_animation(frame),
+            time=self.time_to_string(frame),
+        )
+
+    def render_frame_buffers(self, last_frame: int, jobs: int = 1) -> Iterator[bytes]:
+        # Raw RGBA data of every frame, serialized once per run of identical states and
+        # handed out again for the whole run, so repeated frames cost no allocation.
+        runs = (
+            (state, sum(1 for _ in frames))
+            for state, frames in itertools.groupby(
+                range(last_frame + 1), self.frame_state
             )
         )
-        paste_with_alpha(
-            image,
-            place_image,
-            (round((image.width - place_image.width) * place_position), 0),
+        if jobs <= 1:
+            for state, count in runs:
+                yield from itertools.repeat(self._render_buffer(state), count)
+            return
+
+        # The first run is drawn here, so the cached properties every draw reads are
+        # filled before any worker thread could race on them.
+        for state, count in itertools.islice(runs, 1):
+            yield from itertools.repeat(self._render_buffer(state), count)
+
+        # Draw the upcoming runs on worker threads (Pillow releases the GIL while it
+        # composites) and hand them out in order, at most 2 * jobs runs ahead.
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            pending: deque[tuple[Future[bytes], int]] = deque()
+            for state, count in runs:
+                pending.append((pool.submit(self._render_buffer, state), count))
+                if len(pending) > 2 * jobs:
+                    future, count = pending.popleft()
+                    yield from itertools.repeat(future.result(), count)
+            for future, count in pending:
+                yield from itertools.repeat(future.result(), count)
+
+    def _render_buffer(self, state: FrameState) -> bytes:
+        # ffmpeg reads the pipe as straight rgba, serialize Pillow's buffer as is. Each
+        # distinct state reaches here once per run, so the drawn frame is not kept.
+        image = self._draw_state(state)
+        if image.mode != "RGBA":
+            image = image.convert("RGBA")
+        return image.tobytes()
+
+    @functools.cached_property
+    def _background_with_place(self) -> Callable[[Color, int, int], Image.Image]:
+        return functools.lru_cache(maxsize=64)(self._draw_background_with_place)
+
+    def _draw_background_with_place(
+        self, color: Color, rank: int, x: int
+    ) -> Image.Image:
+        image = init_transparent_image(self.size)
+        image.alpha_composite(
+            render_background((self.width, self.actual_card_height), color),
+            dest=(0, self.top_padding),
         )
+        image.alpha_composite(self.place_images[rank], dest=(x, 0))
+        return image
 
+    @functools.cached_property
+    def layout(self) -> CardLayout:
         logo_xy = 152
         logo_box, content_box = split_horizontal(
             (0, self.top_padding, self.width, self.height),
@@ -208,62 +330,88 @@ class Card:
                 content_box, height=self.height / 2, padding=16, gap=20
             )
         ]
-        logo = self.resized_logo
-        paste_with_alpha(
-            image,
-            logo,
-            dest=(place_grid(center_anchor(logo_box, logo.size))[:2]),
+        return CardLayout(
+            logo=logo_box,
+            title=title_box,
+            subtitle=subtitle_box,
+            task=task_box,
+            status=status_box,
         )
 
-        paste_with_alpha(
-            image,
-            auto_resize_text(
-                self.title,
-                dimensions(title_box),
-                load_bold(10),
-                allow_multiline=True,
-                allow_compression=True,
-                align_center=False,
-            ),
-            dest=(place_grid(title_box)[:2]),
+    @functools.cached_property
+    def _destinations(self) -> dict[str, tuple[int, int]]:
+        logo_box = center_anchor(self.layout.logo, self.resized_logo.size)
+        status_x, status_y, _, _ = place_grid(self.layout.status)
+        return {
+            "logo": place_grid(logo_box)[:2],
+            "title": place_grid(self.layout.title)[:2],
+            "subtitle": place_grid(self.layout.subtitle)[:2],
+            "task": place_grid(self.layout.task)[:2],
+            "status": (status_x, status_y - 5),
+        }
+
+    @functools.cached_property
+    def title_image(self) -> Image.Image:
+        return auto_resize_text(
+            self.title,
+            dimensions(self.layout.title),
+            load_bold(10),
+            allow_multiline=True,
+            allow_compression=True,
+            align_center=False,
         )
-        paste_with_alpha(
-            image,
-            auto_resize_text(
-                f"{self.subtitle} {self.hashtag}",
-                dimensions(subtitle_box),
-                load_regular(10),
-                allow_multiline=False,
-                allow_compression=True,
-                align_center=False,
-                max_size=32,
-            ),
-            dest=(place_grid(subtitle_box)[:2]),
+
+    @functools.cached_property
+    def subtitle_image(self) -> Image.Image:
+        return auto_resize_text(
+            f"{self.subtitle} {self.hashtag}",
+            dimensions(self.layout.subtitle),
+            load_regular(10),
+            allow_multiline=False,
+            allow_compression=True,
+            align_center=False,
+            max_size=32,
         )
-        paste_with_alpha(
-            image,
-            auto_resize_text(
-                self.task,
-                dimensions(task_box),
-                load_bold(10),
-                allow_multiline=False,
-                allow_compression=False,
-                align_center=True,
-            ),
-            dest=(place_grid(task_box)[:2]),
+
+    @functools.cached_property
+    def task_image(self) -> Image.Image:
+        return auto_resize_text(
+            self.task,
+            dimensions(self.layout.task),
+            load_bold(10),
+            allow_multiline=False,
+            allow_compression=False,
+            align_center=True,
         )
-        paste_with_alpha(
-            image,
+
+    @functools.cached_property
+    def _static_content(self) -> Image.Image:
+        # Logo, title, subtitle and task never change, so they are flattened into one layer.
+        image = init_transparent_image(self.size)
+        destinations = self._destinations
+        image.alpha_composite(self.resized_logo, dest=destinations["logo"])
+        image.alpha_composite(self.title_image, dest=destinations["title"])
+        image.alpha_composite(self.subtitle_image, dest=destinations["subtitle"])
+        image.alpha_composite(self.task_image, dest=destinations["task"])
+        return image
+
+    def _draw_state(self, state: FrameState) -> Image.Image:
+        image = self._background_with_place(
+            state.color, state.rank, state.place_x
+        ).copy()
+
+        image.alpha_composite(self._static_content)
+        image.alpha_composite(
             auto_resize_text(
-                f"{self.outcome_animation(frame)} {self.time_to_string(frame)}",
-                dimensions(status_box),
+                f"{state.outcome} {state.time}",
+                dimensions(self.layout.status),
                 load_monspaced(10),
                 allow_multiline=False,
                 allow_compression=False,
                 align_center=True,
                 max_size=32,
             ),
-            dest=((place_grid(status_box)[0], place_grid(status_box)[1] - 5)),
+            dest=self._destinations["status"],
         )
 
         return image
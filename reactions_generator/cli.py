@@ -1,17 +1,28 @@
 import os
+import sys
+import functools
 import math
 import typing
 import requests
 import atexit
 import hashlib
+import shutil
 import re
+import subprocess
+import threading
+import contextlib
 from datetime import timedelta
+from time import sleep
 from io import BytesIO
-from fractions import Fraction
-from typing import Any, NamedTuple
+from pathlib import Path
+from urllib.parse import urlparse
+from queue import Queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import IO, Any, Iterable, NamedTuple
 
 import typer
-import numpy as np
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from tqdm import tqdm
 
 from PIL import Image, ImageColor
@@ -19,7 +30,8 @@ import ffmpeg
 import ffmpeg.types
 
 from reactions_generator.defaults import Defaults
-from reactions_generator.card import Card
+from reactions_generator.hwaccel import HWAccel
+from reactions_generator.card import Card, PILLOW_SIMD
 import tempfile
 from reactions_generator.utils import (
     center_anchor,
@@ -30,17 +42,38 @@ from reactions_generator.utils import (
 app = typer.Typer(no_args_is_help=True)
 
 
+# One pooled session for every request, so polling and downloads reuse connections.
+session = requests.Session()
+_adapter = HTTPAdapter(
+    pool_connections=16,
+    pool_maxsize=64,
+    max_retries=Retry(total=3, backoff_factor=0.2),
+)
+session.mount("http://", _adapter)
+session.mount("https://", _adapter)
+HTTP_TIMEOUT = (3, 30)
+
+
+@functools.lru_cache(maxsize=256)
+def fetch_image_bytes(url: str) -> bytes:
+    # Teams submit many runs with the same logo, download it once per process. The body
+    # is kept as bytes for the cache, BytesIO wraps it without another copy.
+    response = session.get(url, timeout=HTTP_TIMEOUT)
+    response.raise_for_status()
+    return response.content
+
+
+# Callers only read the image, so one decoded logo can back every card of a team.
+@functools.lru_cache(maxsize=128)
 def load_image_or_color(source: str, dimensions: tuple[int, int]) -> Image.Image:
     if source.startswith("#"):
         return Image.new("RGBA", dimensions, color=ImageColor.getrgb(source))
 
     if source.lower().startswith(("http://", "https://")):
-        response = requests.get(source)
-        if response.status_code != 200:
-            raise ValueError(f"Failed to download image from {source}")
-        return Image.open(BytesIO(response.content))
+        return Image.open(BytesIO(fetch_image_bytes(source))).convert("RGBA")
 
-    return Image.open(source)
+    # Decode straight to the mode the card composites in, once per load.
+    return Image.open(source).convert("RGBA")
 
 
 def pipe_card_input(width: int, height: int, fps: float) -> ffmpeg.VideoStream:
@@ -50,45 +83,80 @@ def pipe_card_input(width: int, height: int, fps: float) -> ffmpeg.VideoStream:
         pix_fmt="rgba",
         s=f"{width}x{height}",
         r=fps,
+        # Room for ~2 s of raw frames (~80 MB at 1000x306) before the writer blocks.
+        thread_queue_size=64,
     ).video
 
 
-def to_ffmpeg_frame(image: Image.Image) -> bytes:
-    return np.asarray(image, np.uint8).tobytes()
-
-
 class Metadata(NamedTuple):
-    fps: Fraction
+    fps: float
     duration: float
     audio: bool
 
 
 def direct_ffprobe(video_source: str) -> Metadata:
-    streams = ffmpeg.probe(video_source)["streams"]
-    probe = next(
-        (stream for stream in streams if stream["codec_type"] == "video"),
+    # A single bare ffprobe run printing only what is needed, one "type,rate,duration"
+    # CSV line per stream.
+    output = subprocess.run(
+        [
+            "ffprobe",
+            "-v",
+            "error",
+            "-show_entries",
+            "stream=codec_type,avg_frame_rate,duration",
+            "-of",
+            "csv=p=0",
+            video_source,
+        ],
+        capture_output=True,
+        check=True,
+        text=True,
+    ).stdout
+    streams = [line.split(",") for line in output.splitlines() if line]
+    _, frame_rate, duration = next(
+        (stream for stream in streams if stream[0] == "video"),
     )
+    numerator, denominator = map(int, frame_rate.split("/"))
     return Metadata(
-        fps=Fraction(probe["avg_frame_rate"]),
-        duration=float(probe["duration"]),
-        audio=any(stream["codec_type"] == "audio" for stream in streams),
+        fps=numerator / denominator,
+        duration=float(duration),
+        audio=any(stream[0] == "audio" for stream in streams),
     )
 
 
-def download_and_ffprobe(video_source: str) -> Metadata:
+def download_video(video_source: str, directory: str) -> str:
     if not video_source.startswith(("http://", "https://")):
-        raise ValueError(f"{video_source} is not a URL")
+        return video_source
 
-    response = requests.get(video_source)
+    response = session.get(video_source, stream=True, timeout=HTTP_TIMEOUT)
     if response.status_code != 200:
+        response.close()
         raise ValueError(f"Failed to download video from {video_source}")
 
-    with tempfile.NamedTemporaryFile(delete_on_close=False) as fp:
-        fp.write(response.content)
-        fp.close()
-        metadata = direct_ffprobe(fp.name)
+    _, extension = os.path.splitext(urlparse(video_source).path)
+    # Stream the body to disk in 1 MiB blocks, a whole video never sits in memory.
+    response.raw.decode_content = True
+    with (
+        response,
+        tempfile.NamedTemporaryFile(
+            dir=directory, suffix=extension, delete=False
+        ) as fp,
+    ):
+        shutil.copyfileobj(response.raw, fp, length=1 << 20)
+    return fp.name
 
-    return metadata
+
+def download_and_ffprobe(video_source: str) -> Metadata:
+    if not video_source.startswith(("http://", "https://")):
+        raise ValueError(f"{video_source} is not a URL")
+
+    with tempfile.TemporaryDirectory() as directory:
+        return direct_ffprobe(download_video(video_source, directory))
+
+
+FFMPEG_PROGRESS = re.compile(
+    r"frame=\s*(\d+).*?time=(\d{2}):(\d{2}):(\d{2})\.(\d{2})", re.DOTALL
+)
 
 
 def metadata_via_ffmpeg(video_source: str):
@@ -100,10 +168,16 @@ def metadata_via_ffmpeg(video_source: str):
 
     error_output = str(error_output)
 
-    pattern = r"frame=\s*(\d+).*?time=(\d{2}):(\d{2}):(\d{2})\.(\d{2})"
-    frames, hours, minutes, seconds, milliseconds = re.findall(
-        pattern, error_output, re.DOTALL
-    )[-1]
+    # The last progress line holds the totals: anchor the match on it instead of
+    # collecting every line of a long log.
+    match = FFMPEG_PROGRESS.match(error_output, max(0, error_output.rfind("frame=")))
+    if match is None:
+        # Incomplete final line, keep only the last complete one while rescanning.
+        for match in FFMPEG_PROGRESS.finditer(error_output):
+            pass
+    if match is None:
+        raise ValueError(f"No progress found in ffmpeg output for {video_source}")
+    frames, hours, minutes, seconds, milliseconds = match.groups()
 
     duration = timedelta(
         hours=int(hours),
@@ -113,24 +187,120 @@ def metadata_via_ffmpeg(video_source: str):
     ).total_seconds()
 
     return Metadata(
-        fps=Fraction(int(frames) / duration),
+        fps=int(frames) / duration,
         duration=duration,
         audio="Audio:" in error_output,
     )
 
 
-def get_metadata(video_source: str, expect_audio: bool = False) -> Metadata:
+def probe_metadata(video_source: str) -> Metadata:
+    # One method at a time: neither the download nor the ffmpeg decode can be stopped
+    # once started, so a fallback only runs after the previous method failed.
     for metadata_method in [direct_ffprobe, download_and_ffprobe, metadata_via_ffmpeg]:
         try:
-            metadata = metadata_method(video_source)
-            if not metadata.audio and expect_audio:
-                typer.echo(f"Audio missing in {video_source}", err=True)
-            return metadata
+            return metadata_method(video_source)
         except Exception as e:
             print(e)
     raise ValueError(f"No metadata found for {video_source}")
 
 
+@functools.lru_cache(maxsize=4096)
+def cached_probe_metadata(video_source: str, mtime_ns: int | None) -> Metadata:
+    # mtime_ns only keys the cache, so a local file that changed is probed again. Entries
+    # are a few numbers, so remembering every source of a long session is cheap.
+    return probe_metadata(video_source)
+
+
+def get_metadata(video_source: str, expect_audio: bool = False) -> Metadata:
+    # Downloads land under random temporary paths that never come back, probing them
+    # through the cache would only fill it.
+    downloaded = not video_source.startswith(("http://", "https://")) and Path(
+        video_source
+    ).absolute().is_relative_to(tempfile.gettempdir())
+    if downloaded:
+        metadata = probe_metadata(video_source)
+    else:
+        mtime_ns = None
+        with contextlib.suppress(OSError):
+            mtime_ns = os.stat(video_source).st_mtime_ns
+        metadata = cached_probe_metadata(video_source, mtime_ns)
+    if not metadata.audio and expect_audio:
+        typer.echo(f"Audio missing in {video_source}", err=True)
+    return metadata
+
+
+def write_frames(stdin: IO[bytes], frames: Iterable[bytes], prefetch: int = 8):
+    # Render on the calling thread while a writer thread feeds ffmpeg, so encoding and
+    # card rendering overlap. The bounded queue keeps at most `prefetch` frames in memory.
+    queue: Queue[bytes | None] = Queue(maxsize=prefetch)
+    errors: list[Exception] = []
+
+    def writer():
+        try:
+            while (buffer := queue.get()) is not None:
+                stdin.write(buffer)
+        except Exception as e:
+            errors.append(e)
+            while queue.get() is not None:
+                pass
+
+    thread = threading.Thread(target=writer, daemon=True)
+    thread.start()
+    try:
+        for buffer in frames:
+            if errors:
+                break
+            queue.put(buffer)
+    finally:
+        queue.put(None)
+        thread.join()
+    if errors:
+        raise errors[0]
+
+
+def run_with_frame_pipe(
+    stream: ffmpeg.dag.nodes.GlobalStream, frame_size: int
+) -> subprocess.Popen[bytes]:
+    # run_async does not expose bufsize: start ffmpeg ourselves with a stdin buffer that
+    # fits a whole frame instead of the default 8 KiB.
+    process = subprocess.Popen(
+        stream.overwrite_output().compile(auto_fix=False),
+        stdin=subprocess.PIPE,
+        bufsize=frame_size,
+    )
+    if sys.platform == "linux" and process.stdin:
+        import fcntl
+
+        # Grow the kernel pipe past its 64 KiB default, 1 MiB is the unprivileged limit.
+        with contextlib.suppress(OSError):
+            fcntl.fcntl(
+                process.stdin.fileno(), fcntl.F_SETPIPE_SZ, min(frame_size, 1 << 20)
+            )
+    return process
+
+
+# ffmpeg's default "medium" preset costs several times the encode time for a
+# negligible size gain on these short clips.
+PRESETS = {"libx264": "veryfast", "libx265": "veryfast", "libsvtav1": "12"}
+CRF_CODECS = {"libx264", "libx265", "libsvtav1"}
+
+
+def encoder_options(
+    vcodec: str, preset: str | None, crf: int, tune: str | None
+) -> dict[str, Any]:
+    options: dict[str, Any] = {}
+    preset = preset or PRESETS.get(vcodec)
+    if preset:
+        options["preset"] = preset
+    if tune:
+        options["tune"] = tune
+    if vcodec in CRF_CODECS:
+        options["crf"] = crf
+        # Let the encoder size its own thread pool to every core.
+        options["threads"] = 0
+    return options
+
+
 def render(
     ffmpeg_input: list[Any],
     card: Card,
@@ -140,23 +310,32 @@ def render(
     print_progress: bool,
     vcodec: str,
     acodec: str | None,
+    hwaccel: HWAccel = Defaults.hwaccel,
+    preset: str | None = None,
+    crf: int = Defaults.crf,
+    tune: str | None = None,
+    frame_jobs: int = Defaults.frame_jobs,
 ):
+    if print_progress and not PILLOW_SIMD:
+        typer.echo("Pillow-SIMD is not installed, using stock Pillow.", err=True)
     output_basename = os.path.basename(output_path)
-    output_dirname = os.path.dirname(output_path)
+    output_dirname = Path(output_path).parent
     tmp_output = os.path.join(output_dirname, f"tmp_{output_basename}")
-    os.makedirs(output_dirname, exist_ok=True)
-    process = (
+    output_dirname.mkdir(parents=True, exist_ok=True)
+    process = run_with_frame_pipe(
         ffmpeg.output(
-            *ffmpeg_input,
+            *[hwaccel.upload(stream) for stream in ffmpeg_input],
             filename=tmp_output,
-            vcodec=vcodec,
+            vcodec=hwaccel.vcodec or vcodec,
             acodec=typing.cast(ffmpeg.types.String, acodec),
             r=fps,
-            pix_fmt="yuv420p",
             loglevel="info" if print_progress else "quiet",
-        )
-        .overwrite_output()
-        .run_async(pipe_stdin=True, auto_fix=False)
+            **(
+                hwaccel.output_options
+                | encoder_options(hwaccel.vcodec or vcodec, preset, crf, tune)
+            ),
+        ).global_args(**hwaccel.global_options),
+        frame_size=card.width * card.height * 4,
     )
 
     def clean_up():
@@ -169,8 +348,7 @@ def render(
         if not process.stdin:
             raise ValueError("Process input is none")
 
-        for frame in range(last_frame + 1):
-            process.stdin.write(to_ffmpeg_frame(card.render_frame(frame)))
+        write_frames(process.stdin, card.render_frame_buffers(last_frame, frame_jobs))
         process.stdin.close()
         process.wait()
         os.replace(tmp_output, output_path)
@@ -195,6 +373,11 @@ def render_card(
     duration_seconds: float = Defaults.duration_seconds,
     output_path: str = Defaults.output_path,
     vcodec: str = Defaults.vcodec,
+    hwaccel: HWAccel = Defaults.hwaccel,
+    preset: str | None = None,
+    crf: int = Defaults.crf,
+    tune: str | None = None,
+    frame_jobs: int = Defaults.frame_jobs,
     print_progress: bool = True,
 ):
     """Render card as a video file."""
@@ -227,6 +410,11 @@ def render_card(
         fps=fps,
         print_progress=print_progress,
         vcodec=vcodec,
+        hwaccel=hwaccel,
+        preset=preset,
+        crf=crf,
+        tune=tune,
+        frame_jobs=frame_jobs,
         acodec=None,
     )
 
@@ -250,13 +438,18 @@ def render_reaction(
     fail_audio_path: str = Defaults.fail_audio_path,
     output_path: str = Defaults.output_path,
     vcodec: str = Defaults.vcodec,
+    hwaccel: HWAccel = Defaults.hwaccel,
+    preset: str | None = None,
+    crf: int = Defaults.crf,
+    tune: str | None = None,
+    frame_jobs: int = Defaults.frame_jobs,
     acodec: str = Defaults.acodec,
     print_progress: bool = True,
     sound: bool = Defaults.sound,
 ):
     """Render reaction as a video file."""
     metadata = get_metadata(webcam_source, expect_audio=True)
-    fps = float(metadata.fps)
+    fps = metadata.fps
     last_frame = math.floor(metadata.duration * fps)
     animation_start = max(0, round(last_frame - 30 * fps))
 
@@ -287,17 +480,26 @@ def render_reaction(
     width = 1080
     height = 1920
 
-    webcam_full = ffmpeg.input(webcam_source)
+    webcam_full = ffmpeg.input(webcam_source, **hwaccel.input_options)
     webcam = webcam_full.video.scale(w=card_creator.width, h=-1).setpts(
         expr="PTS-STARTPTS"
     )
     screen = (
-        ffmpeg.input(screen_source)
-        .video.scale(w=card_creator.width, h=-1)
+        ffmpeg.input(screen_source, **hwaccel.input_options)
+        # Screen recordings often run above the webcam rate, drop frames before scaling.
+        .video.fps(fps=fps)
+        .scale(w=card_creator.width, h=-1)
         .setpts(expr="PTS-STARTPTS")
     )
-    background = ffmpeg.input(background_source).scale(w=width, h=height)
-    card = pipe_card_input(card_creator.width, card_creator.height, fps)
+    # Keep the whole canvas in YUV: only the small card gets converted, once per frame.
+    background = (
+        ffmpeg.input(background_source)
+        .scale(w=width, h=height)
+        .format(pix_fmts="yuv420p")
+    )
+    card = pipe_card_input(card_creator.width, card_creator.height, fps).format(
+        pix_fmts="yuva420p"
+    )
 
     gap = 50
     card_position = center_anchor((0, 0, width, height), dimensions=card_creator.size)
@@ -342,6 +544,11 @@ def render_reaction(
         fps=fps,
         print_progress=print_progress,
         vcodec=vcodec,
+        hwaccel=hwaccel,
+        preset=preset,
+        crf=crf,
+        tune=tune,
+        frame_jobs=frame_jobs,
         acodec=acodec,
     )
 
@@ -364,13 +571,18 @@ def render_horizontal_reaction(
     fail_audio_path: str = Defaults.fail_audio_path,
     output_path: str = Defaults.output_path,
     vcodec: str = Defaults.vcodec,
+    hwaccel: HWAccel = Defaults.hwaccel,
+    preset: str | None = None,
+    crf: int = Defaults.crf,
+    tune: str | None = None,
+    frame_jobs: int = Defaults.frame_jobs,
     acodec: str = Defaults.acodec,
     print_progress: bool = True,
     sound: bool = Defaults.sound,
 ):
     """Render reaction as a video file."""
     metadata = get_metadata(webcam_source, expect_audio=True)
-    fps = float(metadata.fps)
+    fps = metadata.fps
     last_frame = math.floor(metadata.duration * fps)
     animation_start = max(0, round(last_frame - 30 * fps))
 
@@ -405,14 +617,17 @@ def render_horizontal_reaction(
         height=300,
     )
 
-    webcam_full = ffmpeg.input(webcam_source)
+    webcam_full = ffmpeg.input(webcam_source, **hwaccel.input_options)
     webcam = webcam_full.video.scale(w=width, h=height).setpts(expr="PTS-STARTPTS")
     screen = (
-        ffmpeg.input(screen_source)
-        .video.scale(w=screen_width, h=-1)
+        ffmpeg.input(screen_source, **hwaccel.input_options)
+        .video.fps(fps=fps)
+        .scale(w=screen_width, h=-1)
         .setpts(expr="PTS-STARTPTS")
     )
-    card = pipe_card_input(card_creator.width, card_creator.height, fps)
+    card = pipe_card_input(card_creator.width, card_creator.height, fps).format(
+        pix_fmts="yuva420p"
+    )
 
     action_sound = ffmpeg.input(
         success_audio_path if success else fail_audio_path
@@ -446,6 +661,11 @@ def render_horizontal_reaction(
         fps=fps,
         print_progress=print_progress,
         vcodec=vcodec,
+        hwaccel=hwaccel,
+        preset=preset,
+        crf=crf,
+        tune=tune,
+        frame_jobs=frame_jobs,
         acodec=acodec,
     )
 
@@ -459,6 +679,11 @@ def build_submission(
     fail_audio_path: str = Defaults.fail_audio_path,
     output_directory: str = Defaults.output_directory,
     vcodec: str = Defaults.vcodec,
+    hwaccel: HWAccel = Defaults.hwaccel,
+    preset: str | None = None,
+    crf: int = Defaults.crf,
+    tune: str | None = None,
+    frame_jobs: int = Defaults.frame_jobs,
     acodec: str = Defaults.acodec,
     vertical: bool = True,
     print_progress: bool = True,
@@ -467,16 +692,15 @@ def build_submission(
 ):
     """Render reaction as a video file."""
     output_path = os.path.join(output_directory, f"{id}.mp4")
-    if os.path.exists(output_path):
-        if overwrite:
-            os.remove(output_path)
-        else:
-            if print_progress:
-                typer.echo(
-                    f"File {output_path} already exists. Use --overwrite to replace."
-                )
-            return
-    response = requests.get(f"{url}/reactions/fullRuns/{id}")
+    # render() swaps the finished file in with os.replace, so an existing output needs
+    # no separate unlink when overwriting.
+    if not overwrite and os.path.exists(output_path):
+        if print_progress:
+            typer.echo(
+                f"File {output_path} already exists. Use --overwrite to replace."
+            )
+        return
+    response = session.get(f"{url}/reactions/fullRuns/{id}", timeout=HTTP_TIMEOUT)
     data = response.json()
     title = data["team"].get("displayName", "")
     subtitle = data["team"]["customFields"].get("clicsTeamFullName", "")
@@ -495,51 +719,75 @@ def build_submission(
     logo_source = data["team"]["organization"]["logo"]["url"]
     webcam_source = data["reactionVideos"][1]["url"]
     screen_source = data["reactionVideos"][0]["url"]
-    if vertical:
-        render_reaction(
-            title=title,
-            subtitle=subtitle,
-            hashtag=hashtag,
-            task=task,
-            time=time,
-            outcome=outcome,
-            success=success,
-            rank_before=rank_before,
-            rank_after=rank_after,
-            logo_source=logo_source,
-            webcam_source=webcam_source,
-            screen_source=screen_source,
-            background_source=background_source,
-            success_audio_path=success_audio_path,
-            fail_audio_path=fail_audio_path,
-            output_path=output_path,
-            print_progress=print_progress,
-            vcodec=vcodec,
-            acodec=acodec,
-            sound=sound,
-        )
-    else:
-        render_horizontal_reaction(
-            title=title,
-            subtitle=subtitle,
-            hashtag=hashtag,
-            task=task,
-            time=time,
-            outcome=outcome,
-            success=success,
-            rank_before=rank_before,
-            rank_after=rank_after,
-            logo_source=logo_source,
-            webcam_source=webcam_source,
-            screen_source=screen_source,
-            success_audio_path=success_audio_path,
-            fail_audio_path=fail_audio_path,
-            output_path=output_path,
-            print_progress=print_progress,
-            vcodec=vcodec,
-            acodec=acodec,
-            sound=sound,
-        )
+    # Fetch both videos side by side up front, ffmpeg then reads and seeks local files.
+    with (
+        tempfile.TemporaryDirectory() as directory,
+        ThreadPoolExecutor(max_workers=2) as pool,
+    ):
+        webcam_download = pool.submit(download_video, webcam_source, directory)
+        screen_download = pool.submit(download_video, screen_source, directory)
+        webcam_source = webcam_download.result()
+        # A missing screen recording is not fatal: keep the URL and let the renderer
+        # fall back to the task image if it cannot be read either.
+        try:
+            screen_source = screen_download.result()
+        except Exception as e:
+            typer.echo(f"Failed to download screen source: {e}")
+        if vertical:
+            render_reaction(
+                title=title,
+                subtitle=subtitle,
+                hashtag=hashtag,
+                task=task,
+                time=time,
+                outcome=outcome,
+                success=success,
+                rank_before=rank_before,
+                rank_after=rank_after,
+                logo_source=logo_source,
+                webcam_source=webcam_source,
+                screen_source=screen_source,
+                background_source=background_source,
+                success_audio_path=success_audio_path,
+                fail_audio_path=fail_audio_path,
+                output_path=output_path,
+                print_progress=print_progress,
+                vcodec=vcodec,
+                hwaccel=hwaccel,
+                preset=preset,
+                crf=crf,
+                tune=tune,
+                frame_jobs=frame_jobs,
+                acodec=acodec,
+                sound=sound,
+            )
+        else:
+            render_horizontal_reaction(
+                title=title,
+                subtitle=subtitle,
+                hashtag=hashtag,
+                task=task,
+                time=time,
+                outcome=outcome,
+                success=success,
+                rank_before=rank_before,
+                rank_after=rank_after,
+                logo_source=logo_source,
+                webcam_source=webcam_source,
+                screen_source=screen_source,
+                success_audio_path=success_audio_path,
+                fail_audio_path=fail_audio_path,
+                output_path=output_path,
+                print_progress=print_progress,
+                vcodec=vcodec,
+                hwaccel=hwaccel,
+                preset=preset,
+                crf=crf,
+                tune=tune,
+                frame_jobs=frame_jobs,
+                acodec=acodec,
+                sound=sound,
+            )
 
 
 def log_error(error_string: str, id: str, output_directory: str):
@@ -550,10 +798,9 @@ def log_error(error_string: str, id: str, output_directory: str):
 
 
 def stable_hash(input_string: str):
-    hash_object = hashlib.sha256()
-    hash_object.update(input_string.encode("utf-8"))
-    hash_int = int(hash_object.hexdigest(), 16)
-    return hash_int
+    # Only used modulo the worker count, a 64-bit BLAKE2b digest is plenty.
+    digest = hashlib.blake2b(input_string.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
 
 
 @app.command("all", help="Continuously render all submissions from the overlayer.")
@@ -564,46 +811,124 @@ def continuous_build_submission(
     fail_audio_path: str = Defaults.fail_audio_path,
     output_directory: str = Defaults.output_directory,
     vcodec: str = Defaults.vcodec,
+    hwaccel: HWAccel = Defaults.hwaccel,
+    preset: str | None = None,
+    crf: int = Defaults.crf,
+    tune: str | None = None,
+    frame_jobs: int = Defaults.frame_jobs,
     acodec: str = Defaults.acodec,
     vertical: bool = True,
     total_workers: int = 1,
     worker_id: int = 0,
     sound: bool = Defaults.sound,
+    jobs: int = Defaults.jobs,
+    poll_interval: float = Defaults.poll_interval,
 ):
     """Render reaction as a video file."""
-    os.makedirs(output_directory, exist_ok=True)
+    Path(output_directory).mkdir(parents=True, exist_ok=True)
 
-    while True:
-        response = requests.get(f"{url}/reactions/runs.json")
-        # ids = [str(run["id"]) for run in response.json() if not run["isHidden"]]
-        ids = [str(run["id"]) for run in response.json()]
-
-        filtered = [id for id in ids if stable_hash(id) % total_workers == worker_id]
-
-        for id in tqdm(filtered, desc="Rendering submissions"):
-            try:
-                build_submission(
-                    id=id,
-                    url=url,
-                    background_source=background_source,
-                    success_audio_path=success_audio_path,
-                    fail_audio_path=fail_audio_path,
-                    output_directory=output_directory,
-                    overwrite=False,
-                    print_progress=False,
-                    vcodec=vcodec,
-                    acodec=acodec,
-                    vertical=vertical,
-                    sound=sound,
-                )
-            except ffmpeg.exceptions.FFMpegExecuteError as e:
-                log_error(
-                    os.linesep.join([str(x) for x in [e, e.stdout, e.stderr]]),
-                    id=id,
-                    output_directory=output_directory,
+    def build(id: str, overwrite: bool) -> bool:
+        try:
+            build_submission(
+                id=id,
+                url=url,
+                background_source=background_source,
+                success_audio_path=success_audio_path,
+                fail_audio_path=fail_audio_path,
+                output_directory=output_directory,
+                overwrite=overwrite,
+                print_progress=False,
+                vcodec=vcodec,
+                hwaccel=hwaccel,
+                preset=preset,
+                crf=crf,
+                tune=tune,
+                frame_jobs=frame_jobs,
+                acodec=acodec,
+                vertical=vertical,
+                sound=sound,
+            )
+        except ffmpeg.exceptions.FFMpegExecuteError as e:
+            log_error(
+                os.linesep.join([str(x) for x in [e, e.stdout, e.stderr]]),
+                id=id,
+                output_directory=output_directory,
+            )
+        except Exception as e:
+            log_error(str(e), id=id, output_directory=output_directory)
+        else:
+            return True
+        return False
+
+    # Renders mostly wait on ffmpeg, so threads are enough; the pool outlives the polls.
+    with (
+        tempfile.TemporaryDirectory() as assets,
+        ThreadPoolExecutor(max_workers=jobs) as pool,
+        tqdm(total=0, desc="Rendering submissions") as progress,
+    ):
+        # Every run shares the background and sounds, remote ones are fetched once.
+        background_source, success_audio_path, fail_audio_path = (
+            download_video(source, assets)
+            for source in (background_source, success_audio_path, fail_audio_path)
+        )
+        etag: str | None = None
+        runs: dict[str, Any] = {}
+        # The last runs.json record each id was rendered with: unchanged runs are
+        # skipped instead of costing a fullRuns request every poll, changed ones (a
+        # verdict that came in later) are rendered over the old video. Failed renders
+        # are dropped from it, so they are retried on the next poll.
+        dispatched: dict[str, Any] = {}
+        # Runs still rendering are not submitted twice; polling goes on meanwhile so
+        # new runs are queued without waiting for the whole batch.
+        inflight: set[str] = set()
+
+        def finished(id: str, future: Future[bool]):
+            inflight.discard(id)
+            if future.cancelled():
+                return
+            if not future.result():
+                dispatched.pop(id, None)
+            progress.update()
+
+        # On Ctrl-C drop the queued backlog, only the renders already running are awaited.
+        try:
+            while True:
+                response = session.get(
+                    f"{url}/reactions/runs.json",
+                    headers={"If-None-Match": etag} if etag else None,
+                    timeout=HTTP_TIMEOUT,
                 )
-            except Exception as e:
-                log_error(str(e), id=id, output_directory=output_directory)
+                if response.status_code != 304:
+                    etag = response.headers.get("ETag")
+                    # runs = {str(run["id"]): run for run in response.json() if not run["isHidden"]}
+                    runs = {str(run["id"]): run for run in response.json()}
+
+                filtered = [
+                    id
+                    for id, run in runs.items()
+                    if stable_hash(id) % total_workers == worker_id
+                    and id not in inflight
+                    and (
+                        dispatched.get(id) != run
+                        # A video deleted during the session is rendered again.
+                        or not os.path.exists(
+                            os.path.join(output_directory, f"{id}.mp4")
+                        )
+                    )
+                ]
+                progress.total += len(filtered)
+                progress.refresh()
+                for id in filtered:
+                    overwrite = dispatched.get(id, runs[id]) != runs[id]
+                    dispatched[id] = runs[id]
+                    inflight.add(id)
+                    pool.submit(build, id, overwrite).add_done_callback(
+                        functools.partial(finished, id)
+                    )
+
+                sleep(poll_interval)
+        finally:
+            pool.shutdown(cancel_futures=True)
 
 
 def main():
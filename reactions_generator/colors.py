@@ -1,5 +1,7 @@
 from PIL import ImageColor
 
+Color = tuple[int, int, int] | tuple[int, int, int, int]
+
 
 class Colors:
     white = ImageColor.getrgb("#ffffff")
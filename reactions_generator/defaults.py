@@ -1,3 +1,8 @@
+import os
+
+from reactions_generator.hwaccel import HWAccel
+
+
 class Defaults:
     title = "UNI"
     subtitle = "Subtitle"
@@ -17,7 +22,14 @@ class Defaults:
     fps = 30
     duration_seconds = 60
     vcodec = "libx264"
+    hwaccel = HWAccel.none
+    crf = 23
     acodec = "aac"
     output_directory = "out"
     sound = True
+    # Every render already runs a multithreaded ffmpeg, leave it most of the cores.
+    jobs = max(1, (os.cpu_count() or 1) // 4)
+    # Frames mostly composite already cached layers, threads only pay off on a spare core.
+    frame_jobs = 1
+    poll_interval = 2.0
     output_path = f"{output_directory}/output.mp4"
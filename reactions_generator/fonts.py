@@ -2,9 +2,19 @@ import functools
 
 from PIL import ImageFont
 
+REGULAR_FONTS = (
+    "./fonts/custom/helvetica.ttf",
+    "./fonts/nimbus/NimbusSans-Regular.ttf",
+)
+BOLD_FONTS = ("./fonts/custom/helvetica_bold.ttf", "./fonts/nimbus/NimbusSans-Bold.ttf")
+MONOSPACED_FONTS = (
+    "./fonts/custom/cour.ttf",
+    "./fonts/nimbus/NimbusMonoPS-Regular.ttf",
+)
+
 
 @functools.cache
-def load_font(fonts: tuple[str]) -> ImageFont.FreeTypeFont:
+def load_font(fonts: tuple[str, ...]) -> ImageFont.FreeTypeFont:
     exception = Exception("No font found")
     for font in fonts:
         try:
@@ -16,20 +26,14 @@ def load_font(fonts: tuple[str]) -> ImageFont.FreeTypeFont:
 
 @functools.cache
 def load_regular(size: int) -> ImageFont.FreeTypeFont:
-    return load_font(
-        ("./fonts/custom/helvetica.ttf", "./fonts/nimbus/NimbusSans-Regular.ttf")
-    ).font_variant(size=size)
+    return load_font(REGULAR_FONTS).font_variant(size=size)
 
 
 @functools.cache
 def load_bold(size: int) -> ImageFont.FreeTypeFont:
-    return load_font(
-        ("./fonts/custom/helvetica_bold.ttf", "./fonts/nimbus/NimbusSans-Bold.ttf")
-    ).font_variant(size=size)
+    return load_font(BOLD_FONTS).font_variant(size=size)
 
 
 @functools.cache
 def load_monspaced(size: int) -> ImageFont.FreeTypeFont:
-    return load_font(
-        ("./fonts/custom/cour.ttf", "./fonts/nimbus/NimbusMonoPS-Regular.ttf")
-    ).font_variant(size=size)
+    return load_font(MONOSPACED_FONTS).font_variant(size=size)
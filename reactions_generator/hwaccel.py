@@ -0,0 +1,57 @@
+from enum import Enum
+from typing import Any
+
+import ffmpeg
+
+
+class HWAccel(str, Enum):
+    none = "none"
+    nvenc = "nvenc"
+    vaapi = "vaapi"
+    qsv = "qsv"
+
+    @property
+    def vcodec(self) -> str | None:
+        return _vcodecs.get(self)
+
+    @property
+    def input_options(self) -> dict[str, Any]:
+        # Decode on the same device; frames are downloaded for the software filters.
+        decoder = _decoders.get(self)
+        return {"hwaccel": decoder} if decoder else {}
+
+    @property
+    def global_options(self) -> dict[str, Any]:
+        if self == HWAccel.vaapi:
+            return {"vaapi_device": "/dev/dri/renderD128"}
+        return {}
+
+    @property
+    def output_options(self) -> dict[str, Any]:
+        match self:
+            case HWAccel.none:
+                return {"pix_fmt": "yuv420p"}
+            case HWAccel.nvenc:
+                return {"pix_fmt": "yuv420p", "preset": "p4"}
+            case HWAccel.vaapi:
+                # Frames reach the encoder as VAAPI surfaces, see upload.
+                return {}
+            case HWAccel.qsv:
+                return {"pix_fmt": "nv12"}
+
+    def upload(self, stream: Any) -> Any:
+        if self == HWAccel.vaapi and isinstance(stream, ffmpeg.VideoStream):
+            return stream.format(pix_fmts="nv12").hwupload()
+        return stream
+
+
+_vcodecs = {
+    HWAccel.nvenc: "h264_nvenc",
+    HWAccel.vaapi: "h264_vaapi",
+    HWAccel.qsv: "h264_qsv",
+}
+_decoders = {
+    HWAccel.nvenc: "cuda",
+    HWAccel.vaapi: "vaapi",
+    HWAccel.qsv: "qsv",
+}
@@ -2,6 +2,9 @@ import math
 
 from enum import Enum
 
+import numpy as np
+import numpy.typing as npt
+
 
 class Easing(Enum):
     EASE_IN_OUT_QUAD = "easeInOutQuad"
@@ -32,3 +35,28 @@ def interpolate(
             return output_range[i] + t * (output_range[i + 1] - output_range[i])
 
     raise ValueError("Value is outside the specified range")
+
+
+def interpolate_array(
+    values: npt.ArrayLike,
+    range_values: list[float],
+    output_range: list[float],
+    easing: Easing | None = None,
+) -> npt.NDArray[np.float64]:
+    if len(range_values) != len(output_range):
+        raise ValueError("Range and output_range must have the same length")
+
+    xs = np.asarray(range_values, dtype=np.float64)
+    ys = np.asarray(output_range, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+
+    # Same segment choice as interpolate: a value on an inner stop belongs to the left segment.
+    index = np.clip(np.searchsorted(xs, values) - 1, 0, len(xs) - 2)
+    t = np.clip((values - xs[index]) / (xs[index + 1] - xs[index]), 0, 1)
+    if easing == Easing.EASE_IN_OUT_QUAD:
+        t = t * t * (3 - 2 * t)
+    elif easing == Easing.EASE_IN_OUT_SIN:
+        t = 0.5 - 0.5 * np.cos(t * np.pi)
+    result = ys[index] + t * (ys[index + 1] - ys[index])
+
+    return np.where(values <= xs[0], ys[0], np.where(values >= xs[-1], ys[-1], result))
@@ -3,34 +3,60 @@ import math
 
 from PIL import Image, ImageDraw, ImageFont
 
-from reactions_generator.colors import Colors
+from reactions_generator.colors import Color, Colors
 from reactions_generator.utils import (
     Box,
-    center_anchor,
-    place_grid,
     init_transparent_image,
 )
 
 
-def measure(
-    draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont, multiline: bool
+@functools.lru_cache(maxsize=256)
+def sized_font(path: str, size: int) -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(path, size)
+
+
+# textbbox never touches the pixels, so one 1x1 draw per font mode serves every measurement.
+@functools.cache
+def measure_draw(fontmode: str) -> ImageDraw.ImageDraw:
+    return ImageDraw.Draw(Image.new(fontmode, (1, 1)))
+
+
+# Keyed by font file and size rather than the font object: every font_variant call
+# yields a new object. The draw only matters through its font mode.
+@functools.lru_cache(maxsize=4096)
+def measure_text(
+    text: str, font_path: str, font_size: int, multiline: bool, fontmode: str
 ) -> tuple[float, float]:
+    draw = measure_draw(fontmode)
+    font = sized_font(font_path, font_size)
     if multiline:
         return draw.multiline_textbbox((0, 0), text, font=font)[2:]
     else:
         return draw.textbbox((0, 0), text, font=font)[2:]
 
 
+def measure(
+    draw: ImageDraw.ImageDraw, text: str, font: ImageFont.FreeTypeFont, multiline: bool
+) -> tuple[float, float]:
+    return measure_text(text, font.path, font.size, multiline, draw.fontmode)
+
+
 def draw_align_centre(
-    draw: ImageDraw.ImageDraw, text: str, box: Box, font: ImageFont.FreeTypeFont
+    draw: ImageDraw.ImageDraw,
+    text: str,
+    box: Box,
+    font: ImageFont.FreeTypeFont,
+    fill: int | Color = Colors.white,
 ) -> None:
-    dimensions = measure(draw, text, font, False)
-    place = place_grid(center_anchor(box, dimensions))
+    width, height = measure(draw, text, font, False)
+    left, top, right, bottom = box
+    # Top-left of place_grid(center_anchor(box, ...)), without the intermediate boxes.
+    xy = (math.ceil((left + right - width) / 2), math.ceil((top + bottom - height) / 2))
     draw.text(
-        place[:2],
+        xy,
         text,
         font=font,
-        fill=Colors.white,
+        fill=fill,
     )
 
 
@@ -40,14 +66,14 @@ def draw_align_left(
     box: Box,
     font: ImageFont.FreeTypeFont,
     multiline: bool = False,
+    fill: int | Color = Colors.white,
 ) -> None:
-    dimensions = measure(draw, text, font, multiline)
-    place = place_grid(center_anchor(box, dimensions))
-    xy = (box[0], place[1])
+    _, height = measure(draw, text, font, multiline)
+    xy = (box[0], math.ceil((box[1] + box[3] - height) / 2))
     if multiline:
-        draw.multiline_text(xy, text, font=font, fill=Colors.white)
+        draw.multiline_text(xy, text, font=font, fill=fill)
     else:
-        draw.text(xy, text, font=font, fill=Colors.white)
+        draw.text(xy, text, font=font, fill=fill)
 
 
 def try_adding_endline(text: str) -> tuple[bool, str]:
@@ -55,20 +81,62 @@ def try_adding_endline(text: str) -> tuple[bool, str]:
         return False, text
 
     middle = len(text) // 2
-    best_position = -1
+    left = text.rfind(" ", 0, middle)
+    right = text.find(" ", middle)
+    if left == -1 and right == -1:
+        return False, text
 
-    for i in range(len(text)):
-        if text[i] == " ":
-            if abs(i - middle) < abs(best_position - middle):
-                best_position = i
+    # Ties go to the left space, the one a left-to-right scan would meet first.
+    if right == -1 or left != -1 and middle - left <= right - middle:
+        best_position = left
+    else:
+        best_position = right
 
-    if best_position == -1:
-        return False, text
+    return True, f"{text[:best_position]}\n{text[best_position + 1 :]}"
 
-    return True, text[:best_position] + "\n" + text[best_position + 1 :]
+
+# Let's add double of the measure error to our dimensions just to be sure
+MEASURE_SLACK = 1 + 2 / 64
+
+
+@functools.lru_cache(maxsize=1024)
+def measure_ratios(text: str, font_path: str, multiline: bool) -> tuple[float, float]:
+    # Text extent per point of font size, measured once at 10pt for every target box.
+    measure_size = 10
+    measure_width, measure_height = measure(
+        measure_draw("1"),
+        text,
+        sized_font(font_path, measure_size),
+        multiline,
+    )
+    measure_width *= MEASURE_SLACK
+    measure_height *= MEASURE_SLACK
+    return measure_width / measure_size, measure_height / measure_size
+
+
+def compute_font_size(
+    ratios: tuple[float, float],
+    dimensions: tuple[int, int],
+    max_horizontal_compression: float,
+    max_size: int,
+) -> int:
+    width_ratio, height_ratio = ratios
+    width, height = dimensions
+    # Both bounds are positive, so int() floors.
+    return int(
+        min(
+            width / width_ratio * max_horizontal_compression,
+            height / height_ratio,
+            max_size,
+        )
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def white_band(dimensions: tuple[int, int]) -> Image.Image:
+    return Image.new("L", dimensions, 255)
 
 
-@functools.cache
 def auto_resize_text(
     text: str,
     dimensions: tuple[float, float],
@@ -78,57 +146,79 @@ def auto_resize_text(
     align_center: bool,
     max_size: int = 150,
 ) -> Image.Image:
+    # The font picks the face only, its size is recomputed, so key the cache on the file.
+    # Every hit wraps the same cached bytes in a read-only image: Pillow copies it on the
+    # first write, so a caller drawing on the result cannot corrupt the cache.
+    size, data = resize_text(
+        text,
+        dimensions,
+        font.path,
+        allow_multiline,
+        allow_compression,
+        align_center,
+        max_size,
+    )
+    return Image.frombuffer("RGBA", size, data, "raw", "RGBA", 0, 1)
+
+
+# Bounded: a long polling session sees an endless stream of team names.
+@functools.lru_cache(maxsize=1024)
+def resize_text(
+    text: str,
+    dimensions: tuple[float, float],
+    font_path: str,
+    allow_multiline: bool,
+    allow_compression: bool,
+    align_center: bool,
+    max_size: int,
+) -> tuple[tuple[int, int], bytes]:
     # For some reason the small text does not look pretty when rendered below the card widget.
     # I think this is mainly caused by the low bitrate in ffmpeg, but just to be sure, I've tried the following tricks:
     # 1. Rendering at 2x size and scaling down.
     # 2. Softening the text with a slight blur filter.
     width, height = map(math.floor, dimensions)
     max_horizontal_compression = 1.5 if allow_compression else 1
-    measure_size = 10
 
     if text == "":
-        return init_transparent_image((width, height))
+        return (width, height), init_transparent_image((width, height)).tobytes()
 
     multiline, text = try_adding_endline(text) if allow_multiline else (False, text)
 
-    measure_width, measure_height = measure(
-        ImageDraw.Draw(Image.new("1", (1, 1))),
-        text,
-        font.font_variant(size=measure_size),
-        multiline,
-    )
-    # Let's add double of the measure error to our dimensions just to be sure
-    measure_width *= 1 + 2 / 64
-    measure_height *= 1 + 2 / 64
-    width_ratio = measure_width / measure_size
-    height_ratio = measure_height / measure_size
+    width_ratio, height_ratio = measure_ratios(text, font_path, multiline)
 
-    font_size = math.floor(
-        min(
-            width / width_ratio * max_horizontal_compression,
-            height / height_ratio,
-            max_size,
-        )
+    font_size = compute_font_size(
+        (width_ratio, height_ratio),
+        (width, height),
+        max_horizontal_compression,
+        max_size,
     )
-    image = init_transparent_image(
+    # Only the coverage varies, so lay out and resample a single band and add white RGB after.
+    mask = Image.new(
+        "L",
         (
             max(width, math.floor(font_size * width_ratio)),
             max(height, math.floor(font_size * height_ratio)),
-        )
+        ),
+        0,
     )
-    draw = ImageDraw.Draw(image)
+    draw = ImageDraw.Draw(mask)
     if align_center:
         draw_align_centre(
             draw,
             text,
-            (0, 0, image.width, image.height),
-            font=font.font_variant(size=font_size),
+            (0, 0, mask.width, mask.height),
+            font=sized_font(font_path, font_size),
+            fill=255,
         )
     else:
         draw_align_left(
             draw,
             text,
-            (0, 0, image.width, image.height),
-            font=font.font_variant(size=font_size),
+            (0, 0, mask.width, mask.height),
+            font=sized_font(font_path, font_size),
+            fill=255,
         )
-    return image.resize((width, height), Image.Resampling.LANCZOS)
+    if mask.size != (width, height):
+        mask = mask.resize((width, height), Image.Resampling.LANCZOS)
+    white = white_band(mask.size)
+    return mask.size, Image.merge("RGBA", (white, white, white, mask)).tobytes()
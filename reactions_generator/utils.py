@@ -1,3 +1,4 @@
+import functools
 import math
 
 from PIL import Image, ImageDraw
@@ -8,10 +9,14 @@ def init_transparent_image(dimensions: tuple[int, int]) -> Image.Image:
     return Image.new("RGBA", (width, height), (0, 0, 0, 0))
 
 
-def rounded_mask(dimensions: tuple[int, int]) -> Image.Image:
-    mask = Image.new("1", dimensions, 0)
+# Shared between callers: treat the returned mask as read-only.
+@functools.lru_cache(maxsize=32)
+def rounded_mask(dimensions: tuple[int, int], radius: int = 48) -> Image.Image:
+    # An 8-bit mask reads as a plain byte array and works as a paste or composite
+    # alpha directly, without unpacking and expanding a 1-bit image every use.
+    mask = Image.new("L", dimensions, 0)
     draw = ImageDraw.Draw(mask)
-    draw.rounded_rectangle((0, 0, mask.width, mask.height), radius=48, fill=1)
+    draw.rounded_rectangle((0, 0, mask.width, mask.height), radius=radius, fill=255)
     return mask
 
 
@@ -27,14 +32,6 @@ def place_grid(box: Box) -> tuple[int, int, int, int]:
     return math.ceil(box[0]), math.ceil(box[1]), math.floor(box[2]), math.floor(box[3])
 
 
-def paste_with_alpha(
-    image: Image.Image, transparent_content: Image.Image, dest: tuple[int, int]
-) -> Image.Image:
-    transparent_content = transparent_content.convert("RGBA")
-    image.paste(transparent_content, dest, mask=transparent_content)
-    return image
-
-
 def center_anchor(box: Box, dimensions: tuple[float, float]) -> Box:
     width, height = dimensions
     left, top, right, bottom = box
@@ -43,23 +40,21 @@ def center_anchor(box: Box, dimensions: tuple[float, float]) -> Box:
     return archor_left, archor_top, archor_left + width, archor_top + height
 
 
+def center_span(left: float, right: float, width: float) -> tuple[float, float]:
+    # Same rounding as (left + right - width) / 2: the sum is evaluated first either way.
+    both = left + right
+    return (both - width) / 2, (both + width) / 2
+
+
 def place_above(box: Box, dimensins: tuple[float, float], gap: float = 0) -> Box:
     width, height = dimensins
     left, top, right, _ = box
-    return (
-        (left + right - width) / 2,
-        top - height - gap,
-        (left + right + width) / 2,
-        top - gap,
-    )
+    span_left, span_right = center_span(left, right, width)
+    return span_left, top - height - gap, span_right, top - gap
 
 
 def place_below(box: Box, dimensins: tuple[float, float], gap: float = 0) -> Box:
     width, height = dimensins
     left, _, right, bottom = box
-    return (
-        (left + right - width) / 2,
-        bottom + gap,
-        (left + right + width) / 2,
-        bottom + height + gap,
-    )
+    span_left, span_right = center_span(left, right, width)
+    return span_left, bottom + gap, span_right, bottom + height + gap